@@ -6,10 +6,11 @@ def _load_config():
     config.read('config.ini')
     return config
 
-def get_redis_connection():
+def get_redis_connection(db=0):
     config = _load_config()
     params = {
         'host': config.get('redis_connection', 'host', fallback='localhost'),
+        'db': db,
         'port': config.getint('redis_connection', 'port', fallback=6379),
         'decode_responses': config.getboolean('redis_connection', 'decode_responses', fallback=True)
     }
@@ -27,5 +28,16 @@ def get_extractor_config():
     return {
         'database': config.getint('extractor', 'database', fallback=0),
         'batch_size': config.getint('extractor', 'batch_size', fallback=1000),
+        'max_workers': config.getint('extractor', 'max_workers', fallback=8),
         'export_variations': config.getboolean('extractor', 'export_variations', fallback=False),
+        'batched_inference': config.getboolean('extractor', 'batched_inference', fallback=False),
+        'key_patterns': config.get('extractor', 'key_patterns', fallback='').replace(',', ' ').split(),
+    }
+
+def get_service_config():
+    config = _load_config()
+    return {
+        'host': config.get('service', 'host', fallback='127.0.0.1'),
+        'port': config.getint('service', 'port', fallback=8080),
+        'refresh_interval': config.getint('service', 'refresh_interval', fallback=300),
     }
\ No newline at end of file
@@ -3,16 +3,37 @@ from tqdm import tqdm
 from collections import defaultdict
 from utils import is_id_token, parse_value, remove_empty_containers, KEY_SEPARATORS
 
-def group_keys(kv_pairs):
+KEY_PARTS_REGEX = re.compile(f'({KEY_SEPARATORS})')
+ARRAY_INDEX_REGEX = re.compile(r'\[\d+\]')
+
+def split_key(key):
+    ## Segments at even positions, separators at odd positions
+    return KEY_PARTS_REGEX.split(key)
+
+def group_keys(kv_pairs, key_parts=None):
     groups = defaultdict(list)
+    if key_parts is None:
+        key_parts = [split_key(key) for key, _ in kv_pairs]
     
-    for key, value in tqdm(kv_pairs):
-        segments = re.split(KEY_SEPARATORS, key)
-        id_path = _find_id_path(segments)
+    for (key, value), parts in zip(tqdm(kv_pairs), key_parts):
+        id_path = _find_id_path(parts[::2])
         groups[id_path].append((key, value))
     
     return dict(groups)
     
+def key_template(parts):
+    ## e.g. product:42:tags[3] -> product:{id}:tags[*]
+    template = parts.copy()
+    
+    for i in range(0, len(parts), 2):
+        segment = parts[i]
+        if is_id_token(segment):
+            template[i] = '{id}'
+        elif '[' in segment:
+            template[i] = ARRAY_INDEX_REGEX.sub('[*]', segment)
+    
+    return ''.join(template)
+
 def _find_id_path(segments):
     for i, segment in enumerate(segments, 1):
         if is_id_token(segment):
@@ -1,49 +1,33 @@
-from tqdm import tqdm
-from config import get_redis_connection, get_extractor_config
-from redis_extractor import extract_database
-from key_parser import group_keys, build_nested_structure
-from schema_inference import extract_schema
-from schema_processor import group_schema_variations, combine_schema_variations
+import argparse
+import asyncio
+from config import get_redis_connection, get_extractor_config, get_service_config
+from pipeline import extract_schemas
 from utils import write_json_file
 
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Extract a schema from a Redis database")
+    parser.add_argument('--patterns', nargs='+', metavar='PATTERN',
+                        help="Key glob patterns to extract (e.g. 'user:*'); prefix with '!' to exclude (e.g. '!session:*')")
+    parser.add_argument('--serve', action='store_true',
+                        help="Run as an HTTP service that keeps the latest schema cached and refreshes it periodically")
+    return parser.parse_args()
+
 def main():
+    args = _parse_args()
     config = get_extractor_config()
-    conn = get_redis_connection()
+    if args.patterns:
+        config['key_patterns'] = args.patterns
+    
+    if args.serve:
+        from schema_service import run_service
+        asyncio.run(run_service(config, get_service_config()))
+        return
+    
+    conn = get_redis_connection(config['database'])
 
     try:
-        ## Extract data from Redis database
-        kv_data = extract_database(conn, config['database'], config['batch_size'])
+        combined_schemas, entity_variations = extract_schemas(conn, config, config['key_patterns'])
         conn.close()
-
-        ## Group keys by entity instance
-        print("\nGrouping keys...")
-        grouped_keys = group_keys(kv_data)
-        print(f"Created {len(grouped_keys)} groups")
-
-        ## Build object structures
-        print("\nBuilding object structures...")
-        object_instances = [
-            build_nested_structure(group_id, pairs) 
-            for group_id, pairs in tqdm(grouped_keys.items())
-        ]
-
-        ## Extract schemas
-        print("\nExtracting schemas...")
-        schema_variations = [extract_schema(obj) for obj in tqdm(object_instances)]
-
-        ## Group schemas by entity
-        print("\nGrouping schema variations...")
-        entity_variations = group_schema_variations(schema_variations)
-
-        ## Combine schemas
-        print("\nCombining schemas...")
-        combined_schemas = {}
-        
-        for entity, variations in entity_variations.items():
-            print(f"Entity '{entity}': {len(variations)} variations")
-
-            combined = combine_schema_variations(variations)
-            combined_schemas[entity] = combined
         
         ## Export results
         if config['export_variations']:
@@ -0,0 +1,51 @@
+from tqdm import tqdm
+from redis_extractor import extract_database
+from key_parser import group_keys, build_nested_structure, split_key
+from schema_inference import extract_schema, batch_infer_values
+from schema_processor import group_schema_variations, combine_schema_variations
+
+def extract_schemas(conn, config, patterns=None, restrict_to=None):
+    ## Extract data from Redis database
+    ## With batched inference, string values stay raw so their columns can be classified together
+    kv_data = extract_database(conn, config['batch_size'], patterns, config['max_workers'], restrict_to,
+                               parse_strings=not config['batched_inference'])
+
+    ## Split every key once; templating and grouping share the result
+    key_parts = [split_key(key) for key, _ in kv_data]
+
+    ## Infer string value types column-wise per key template
+    if config['batched_inference']:
+        print("\nInferring value types in batch...")
+        kv_data = batch_infer_values(kv_data, key_parts)
+
+    ## Group keys by entity instance
+    print("\nGrouping keys...")
+    grouped_keys = group_keys(kv_data, key_parts)
+    print(f"Created {len(grouped_keys)} groups")
+
+    ## Build object structures
+    print("\nBuilding object structures...")
+    object_instances = [
+        build_nested_structure(group_id, pairs) 
+        for group_id, pairs in tqdm(grouped_keys.items())
+    ]
+
+    ## Extract schemas
+    print("\nExtracting schemas...")
+    schema_variations = [extract_schema(obj) for obj in tqdm(object_instances)]
+
+    ## Group schemas by entity
+    print("\nGrouping schema variations...")
+    entity_variations = group_schema_variations(schema_variations)
+
+    ## Combine schemas
+    print("\nCombining schemas...")
+    combined_schemas = {}
+    
+    for entity, variations in entity_variations.items():
+        print(f"Entity '{entity}': {len(variations)} variations")
+
+        combined = combine_schema_variations(variations)
+        combined_schemas[entity] = combined
+    
+    return combined_schemas, entity_variations
@@ -1,18 +1,21 @@
-from utils import parse_value
+import time
+from threading import Lock
+from concurrent.futures import ThreadPoolExecutor
+from utils import parse_value, compile_key_pattern
 from tqdm import tqdm
 
-def _get_redis_value_batch(keys, conn, db, batch_size):
-    conn.select(db)
+def _get_redis_value_batch(keys, conn, batch_size, desc=None, position=None, parse_strings=True):
     results = {}
     
-    for i in tqdm(range(0, len(keys), batch_size)):
+    for i in tqdm(range(0, len(keys), batch_size), desc=desc, position=position):
         batch_keys = keys[i:i + batch_size]
-        batch_results = _process_key_batch(batch_keys, conn)
+        batch_results = _process_key_batch(batch_keys, conn, parse_strings)
         results.update(batch_results)
     
     return results
 
-def _process_key_batch(keys, conn):
+def _process_key_batch(keys, conn, parse_strings=True):
+    ## parse_strings=False keeps string values raw (for batched inference)
     pipe = conn.pipeline()
     for key in keys:
         pipe.type(key)
@@ -34,7 +37,7 @@ def _process_key_batch(keys, conn):
             if value is not None:
                 try:
                     if value.isprintable():
-                        results[key] = parse_value(value)
+                        results[key] = parse_value(value) if parse_strings else value
                     else:
                         results[key] = None
                 except:
@@ -76,21 +79,91 @@ def _add_to_pipeline(pipe, key, key_type):
     else:
         pipe.exists(key)
 
-def _get_all_keys(conn, db, batch_size):
-    conn.select(db)
+def _get_all_keys(conn, batch_size, pattern='*', exclude_patterns=(), restrict_patterns=None):
     keys, cursor = [], 0
     
     while True:
-        cursor, batch = conn.scan(cursor, count=batch_size)
-        keys.extend(batch)
+        cursor, batch = conn.scan(cursor, match=pattern, count=batch_size)
+        keys.extend(key for key in batch if _is_selected(key, exclude_patterns, restrict_patterns))
         if cursor == 0:
             break
     
     return keys
 
-def extract_database(conn, db, batch_size=10000):
-    print("Collecting keys...")
-    keys = _get_all_keys(conn, db, batch_size)
-    print(f"Number of keys collected: {len(keys)}\nGetting values...")
-    key_value_dict = _get_redis_value_batch(keys, conn, db, batch_size)
-    return sorted([(key, key_value_dict[key]) for key in keys])
\ No newline at end of file
+def _is_selected(key, exclude_patterns, restrict_patterns):
+    if any(pattern.fullmatch(key) for pattern in exclude_patterns):
+        return False
+    return restrict_patterns is None or any(pattern.fullmatch(key) for pattern in restrict_patterns)
+
+def parse_key_patterns(patterns):
+    include, exclude = [], []
+    
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if pattern.startswith('!'):
+            exclude.append(pattern[1:])
+        elif pattern not in include:
+            include.append(pattern)
+    
+    return include or ['*'], exclude
+
+def _claim_keys(keys, claimed, claim_lock):
+    ## Overlapping patterns: only the first worker to claim a key fetches its value
+    with claim_lock:
+        new_keys = [key for key in keys if key not in claimed]
+        claimed.update(new_keys)
+    return new_keys
+
+def _extract_pattern(conn, batch_size, pattern, exclude_patterns, restrict_patterns, claimed, claim_lock, position,
+                     parse_strings):
+    ## Workers share the client's connection pool; pipelines are created per batch
+    start = time.perf_counter()
+    keys = _get_all_keys(conn, batch_size, pattern, exclude_patterns, restrict_patterns)
+    scan_time = time.perf_counter() - start
+    new_keys = _claim_keys(keys, claimed, claim_lock)
+    values = _get_redis_value_batch(new_keys, conn, batch_size, pattern, position, parse_strings)
+    
+    stats = {
+        'keys': len(keys),
+        'fetched': len(new_keys),
+        'scan_time': scan_time,
+        'total_time': time.perf_counter() - start
+    }
+    return values, stats
+
+def _collect_key_values(conn, batch_size, include, exclude, max_workers, restrict_to, parse_strings=True):
+    exclude_patterns = [compile_key_pattern(pattern) for pattern in exclude]
+    restrict_patterns = [compile_key_pattern(pattern) for pattern in restrict_to] if restrict_to else None
+    claimed, claim_lock = set(), Lock()
+    key_value_dict, pattern_stats = {}, {}
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(len(include), max_workers))) as executor:
+        futures = {
+            pattern: executor.submit(_extract_pattern, conn, batch_size, pattern, exclude_patterns,
+                                     restrict_patterns, claimed, claim_lock, position, parse_strings)
+            for position, pattern in enumerate(include)
+        }
+        
+        for pattern, future in futures.items():
+            values, stats = future.result()
+            key_value_dict.update(values)
+            pattern_stats[pattern] = stats
+    
+    return key_value_dict, pattern_stats
+
+def extract_database(conn, batch_size=10000, patterns=None, max_workers=8, restrict_to=None, parse_strings=True):
+    ## restrict_to: optional patterns every collected key must also match (e.g. the configured includes)
+    include, exclude = parse_key_patterns(patterns or [])
+    print(f"Collecting keys (include: {include}, exclude: {exclude})...")
+    
+    key_value_dict, pattern_stats = _collect_key_values(conn, batch_size, include, exclude, max_workers,
+                                                        restrict_to, parse_strings)
+    
+    for pattern, stats in pattern_stats.items():
+        print(f"Pattern '{pattern}': {stats['keys']} keys, {stats['fetched']} fetched "
+              f"(scan {stats['scan_time']:.2f}s, total {stats['total_time']:.2f}s)")
+    print(f"Number of keys collected: {len(key_value_dict)}")
+    
+    return sorted(key_value_dict.items())
\ No newline at end of file
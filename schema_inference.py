@@ -1,7 +1,21 @@
 import json
+import numpy as np
+from collections import defaultdict
 from utils import parse_value
+from key_parser import key_template, split_key
+
+STRING_PREFIX_LENGTH = 32 # longer strings are classified from their prefix only
+JSON_WHITESPACE = ' \t\n\r'
+JSON_START_CHARS = list('{["-0123456789tfnNI\'') # parse_value may turn strings starting with these into other types
+
+## batch_infer_values replaces classified strings with the Python type they parse to; unlike
+## wrapper objects, built-in types keep dicts and tuples holding them untracked by the garbage collector
+SCHEMA_TYPES = {str: "string", bool: "boolean", int: "integer", float: "number", type(None): "null"}
 
 def _infer_schema(value):
+    if type(value) is type:
+        return {"type": SCHEMA_TYPES[value]}
+    
     value = parse_value(value) if isinstance(value, str) else value
     
     type_map = {
@@ -33,4 +47,97 @@ def _merge_array_schemas(schemas):
 
 def extract_schema(obj):
     entity = next(iter(obj.keys()))
-    return {entity: _infer_schema(obj[entity])}
\ No newline at end of file
+    return {entity: _infer_schema(obj[entity])}
+
+def _collect_strings(fields, value):
+    ## Only strings need inference work (parse_value); other scalars already carry their type
+    if type(value) is str:
+        fields[None].append(value)
+    elif type(value) is dict:
+        for field, v in value.items():
+            if type(v) is str:
+                fields[field].append(v)
+    elif type(value) in (list, set):
+        fields['[]'].extend(v for v in value if type(v) is str)
+
+def _replace_strings(fields, value):
+    ## Values are updated in place where possible to avoid allocating new containers
+    if type(value) is str:
+        ## Unclassified raw string values get the extractor's parse_value; _infer_schema parses them again as before
+        return next(fields[None]) or parse_value(value)
+    elif type(value) is dict:
+        for field, v in value.items():
+            if type(v) is str:
+                value[field] = next(fields[field]) or v
+    elif type(value) is list:
+        items = fields.get('[]')
+        for i, v in enumerate(value):
+            if type(v) is str:
+                value[i] = next(items) or v
+    elif type(value) is set:
+        items = fields.get('[]')
+        return [(next(items) or v) if type(v) is str else v for v in value]
+    return value
+
+def _classify_strings(strings):
+    ## Mirrors parse_value + _infer_schema; anything ambiguous is left as None (per-value inference)
+    lengths = np.array([len(s) for s in strings])
+    if lengths.max() > STRING_PREFIX_LENGTH:
+        strings = [s[:STRING_PREFIX_LENGTH] for s in strings]
+    prefixes = np.array(strings, dtype=str)
+    prefix_lengths = np.char.str_len(prefixes)
+    
+    # NumPy drops trailing NULs, and only ASCII digits are valid JSON numbers
+    valid = prefix_lengths == np.minimum(lengths, STRING_PREFIX_LENGTH)
+    complete = valid & (lengths <= STRING_PREFIX_LENGTH)
+    ascii = prefixes.view(np.uint32).reshape(len(strings), -1).max(axis=1) < 128
+    
+    stripped = np.char.lstrip(prefixes, JSON_WHITESPACE)
+    stripped_lengths = np.char.str_len(stripped)
+    plain = valid & (stripped_lengths > 0) & ~np.isin(stripped.astype('<U1'), JSON_START_CHARS)
+    blank = complete & (lengths > 0) & (stripped_lengths == 0)
+    
+    negative = np.char.startswith(prefixes, '-')
+    body = np.where(negative, np.char.replace(prefixes, '-', '', 1), prefixes)
+    digits = np.char.replace(body, '.', '', 1)
+    has_dot = np.char.str_len(digits) < np.char.str_len(body)
+    numeric = complete & ascii & np.char.isdecimal(digits)
+    leading_zero = np.char.startswith(body, '0') & (np.char.str_len(body) > 1) & ~np.char.startswith(body, '0.')
+    dot_inside = ~np.char.startswith(body, '.') & ~np.char.endswith(body, '.')
+    
+    result = np.full(len(strings), None, dtype=object)
+    result[plain | blank] = str
+    result[numeric & ~has_dot & ~leading_zero] = int
+    result[numeric & has_dot & dot_inside & ~leading_zero] = float
+    result[complete & np.isin(prefixes, ["True", "False", "true", "false"])] = bool
+    result[(lengths == 0) | (complete & (prefixes == "null"))] = type(None)
+    
+    return result.tolist()
+
+def batch_infer_values(kv_pairs, key_parts=None):
+    """Infer string value types column-wise, grouping values by key template (and hash field / list items).
+
+    String values of string keys must be raw, i.e. extracted with parse_strings=False.
+    Values are updated in place and kv_pairs is returned.
+    """
+    if key_parts is None:
+        key_parts = [split_key(key) for key, _ in kv_pairs]
+    templates = [key_template(parts) for parts in key_parts]
+    columns = defaultdict(lambda: defaultdict(list)) # template -> field (None: value, '[]': items) -> strings
+    
+    for template, (_, value) in zip(templates, kv_pairs):
+        _collect_strings(columns[template], value)
+    
+    inferred = {
+        template: {field: iter(_classify_strings(cells)) for field, cells in fields.items()}
+        for template, fields in columns.items()
+    }
+    
+    for i, (template, (key, value)) in enumerate(zip(templates, kv_pairs)):
+        fields = inferred.get(template)
+        if fields is not None:
+            replaced = _replace_strings(fields, value)
+            if replaced is not value:
+                kv_pairs[i] = (key, replaced)
+    
+    return kv_pairs
\ No newline at end of file
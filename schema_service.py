@@ -0,0 +1,194 @@
+import asyncio
+import json
+import re
+import time
+from urllib.parse import unquote, urlsplit
+from config import get_redis_connection
+from pipeline import extract_schemas
+from redis_extractor import parse_key_patterns
+from utils import get_schema_hash
+
+GLOB_SPECIAL_CHARS = re.compile(r'([*?\[\]\\])')
+HTTP_STATUS = {
+    200: 'OK',
+    304: 'Not Modified',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    502: 'Bad Gateway'
+}
+
+class SchemaService:
+    def __init__(self, config, connection_factory=None):
+        self.config = config
+        self.connection_factory = connection_factory or (lambda: get_redis_connection(config['database']))
+        self.combined_schemas = {}
+        self.entity_variations = {}
+        self.etags = {} # None (combined schema) or entity -> ETag of its cached response
+        self.updated_at = None # time of the last successful full extraction
+        self._in_flight = {} # None (full extraction) or entity -> running task
+
+    async def refresh(self, entity=None):
+        ## A full extraction in progress also covers any single entity
+        task = self._in_flight.get(None) or self._in_flight.get(entity)
+
+        if task is None:
+            task = asyncio.ensure_future(self._run_refresh(entity))
+            self._in_flight[entity] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(entity, None))
+
+        ## Shielded so a disconnecting client does not cancel the shared extraction
+        await asyncio.shield(task)
+
+    async def _run_refresh(self, entity):
+        if entity is None:
+            patterns, restrict_to = self.config['key_patterns'], None
+        else:
+            patterns, restrict_to = self._entity_patterns(entity), self._include_patterns()
+        combined_schemas, entity_variations = await asyncio.to_thread(self._extract, patterns, restrict_to)
+
+        if entity is None:
+            self.combined_schemas, self.entity_variations = combined_schemas, entity_variations
+            self.etags = {name: self._etag(name) for name in combined_schemas}
+            self.updated_at = time.time()
+        elif entity in combined_schemas:
+            self.combined_schemas[entity] = combined_schemas[entity]
+            self.entity_variations[entity] = entity_variations[entity]
+            self.etags[entity] = self._etag(entity)
+        else:
+            self.combined_schemas.pop(entity, None)
+            self.entity_variations.pop(entity, None)
+            self.etags.pop(entity, None)
+
+        self.etags[None] = self._etag()
+
+    def _etag(self, entity=None):
+        return f'"{get_schema_hash(self.get_schema(entity))}"'
+
+    def _entity_patterns(self, entity):
+        escaped = GLOB_SPECIAL_CHARS.sub(r'\\\1', entity)
+        excludes = [p for p in self.config['key_patterns'] if p.startswith('!')]
+        return [escaped, f"{escaped}[:/.]*"] + excludes
+
+    def _include_patterns(self):
+        ## Entity refreshes stay within the configured includes, like full refreshes
+        include, _ = parse_key_patterns(self.config['key_patterns'])
+        return None if include == ['*'] else include
+
+    def _extract(self, patterns, restrict_to=None):
+        conn = self.connection_factory()
+        try:
+            return extract_schemas(conn, self.config, patterns, restrict_to)
+        finally:
+            conn.close()
+
+    def get_schema(self, entity=None):
+        if entity is None:
+            return {"type": "object", "properties": self.combined_schemas}
+        if entity not in self.combined_schemas:
+            return None
+        return {"schema": self.combined_schemas[entity], "variations": self.entity_variations[entity]}
+
+    async def refresh_periodically(self, interval):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                print(f"Error during scheduled extraction: {e}")
+            await asyncio.sleep(interval)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            method, target, headers = await _read_request(reader)
+            status, body, etag = await self._dispatch(method, target)
+
+            if status == 200 and etag == headers.get('if-none-match'):
+                status, body = 304, None
+
+            await _write_response(writer, status, body, etag)
+        except (ValueError, asyncio.IncompleteReadError):
+            await _write_response(writer, 400, {"error": "malformed request"})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, target):
+        segments = [unquote(s) for s in urlsplit(target).path.strip('/').split('/')]
+
+        ## GET /schema[/{entity}] reads, POST /schema[/{entity}]/refresh re-extracts
+        if method == 'GET':
+            refresh, route = False, segments[1:]
+        elif method == 'POST':
+            refresh, route = segments[-1] == 'refresh', segments[1:-1]
+        else:
+            return 405, {"error": f"method {method} not allowed"}, None
+
+        if segments[0] != 'schema' or len(route) > 1 or (method == 'POST' and not refresh):
+            return 404, {"error": "not found"}, None
+
+        entity = route[0] if route else None
+
+        try:
+            if refresh:
+                await self.refresh(entity)
+            elif self.updated_at is None:
+                ## No full extraction has succeeded yet; wait for (or start) one
+                await self.refresh()
+        except Exception as e:
+            return 502, {"error": f"extraction failed: {e}"}, None
+
+        schema = self.get_schema(entity)
+        if schema is None:
+            return 404, {"error": f"unknown entity '{entity}'"}, None
+
+        return 200, schema, self.etags[entity]
+
+async def _read_request(reader):
+    request_line = (await reader.readline()).decode('latin-1').strip()
+    method, target, _ = request_line.split(' ', 2)
+
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode('latin-1').strip()
+        if not line:
+            break
+        name, value = line.split(':', 1)
+        headers[name.strip().lower()] = value.strip()
+
+    ## Request bodies are not used, but must be consumed
+    await reader.readexactly(int(headers.get('content-length', 0)))
+
+    return method.upper(), target, headers
+
+async def _write_response(writer, status, body, etag=None):
+    payload = json.dumps(body).encode() if body is not None else b''
+    lines = [f"HTTP/1.1 {status} {HTTP_STATUS[status]}", "Connection: close"]
+
+    if etag:
+        lines.append(f"ETag: {etag}")
+    if body is not None:
+        lines.append("Content-Type: application/json")
+    lines.append(f"Content-Length: {len(payload)}")
+
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + payload)
+    await writer.drain()
+
+async def start_service(config, service_config, connection_factory=None):
+    service = SchemaService(config, connection_factory)
+    server = await asyncio.start_server(service.handle_connection, service_config['host'], service_config['port'])
+    refresher = asyncio.ensure_future(service.refresh_periodically(service_config['refresh_interval']))
+    return service, server, refresher
+
+async def run_service(config, service_config):
+    service, server, refresher = await start_service(config, service_config)
+
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"Serving schema on http://{host}:{port}/schema "
+          f"(refresh every {service_config['refresh_interval']}s)")
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        refresher.cancel()
@@ -0,0 +1,36 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+@pytest.fixture(scope='session')
+def redis_port():
+    """Port of a throwaway redis-server; tests using it are skipped when none is installed."""
+    redis = pytest.importorskip('redis')
+    redis_server = shutil.which('redis-server')
+    if redis_server is None:
+        pytest.skip("redis-server not found in PATH")
+
+    port = _free_port()
+    server = subprocess.Popen([redis_server, '--port', str(port), '--save', '', '--appendonly', 'no'],
+                              stdout=subprocess.DEVNULL)
+    conn = redis.Redis(port=port)
+    for _ in range(50):
+        try:
+            conn.ping()
+            break
+        except redis.ConnectionError:
+            time.sleep(0.1)
+    yield port
+    server.terminate()
+    server.wait()
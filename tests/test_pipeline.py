@@ -0,0 +1,44 @@
+import pytest
+
+redis = pytest.importorskip('redis')
+import schema_inference
+from pipeline import extract_schemas
+
+@pytest.fixture
+def conn(redis_port):
+    conn = redis.Redis(port=redis_port, db=3, decode_responses=True)
+    conn.flushdb()
+    for i in range(20):
+        conn.set(f"product:{i}:price", f"{i}.99")
+        conn.set(f"product:{i}:stock", str(i))
+        conn.set(f"product:{i}:name", f"Product {i}")
+        conn.set(f"product:{i}:active", "True")
+        conn.set(f"product:{i}:code", '"5"' if i % 2 else "'7'")
+        conn.set(f"product:{i}:meta", '{"color": "red"}')
+        conn.hset(f"customer:{i}", mapping={"age": str(20 + i), "score": "0.5", "name": "customer"})
+    conn.set("config:empty", "")
+    yield conn
+    conn.close()
+
+def _extract(conn, batched_inference):
+    config = {'batch_size': 50, 'max_workers': 2, 'batched_inference': batched_inference}
+    return extract_schemas(conn, config)
+
+def test_batched_inference_classifies_raw_string_keys(conn, monkeypatch):
+    classified = []
+    classify_strings = schema_inference._classify_strings
+    monkeypatch.setattr(schema_inference, '_classify_strings',
+                        lambda strings: classified.extend(strings) or classify_strings(strings))
+
+    batched = _extract(conn, True)
+    assert {f"{i}.99" for i in range(20)} <= set(classified)
+    assert {str(i) for i in range(20)} <= set(classified)
+
+    classified.clear()
+    assert _extract(conn, False) == batched
+    assert classified == []
+
+    properties = batched[0]['product']['properties']
+    assert properties['price'] == {'type': 'number'}
+    assert properties['stock'] == {'type': 'integer'}
+    assert properties['code'] == {'type': 'integer'} # '"5"' and "'7'" are parsed twice, as in the per-value path
@@ -0,0 +1,55 @@
+import pytest
+
+redis = pytest.importorskip('redis')
+import redis_extractor
+from redis_extractor import extract_database, _collect_key_values
+from utils import compile_key_pattern
+
+KEYS = ['hello', 'hallo', 'hxllo', 'hllo', 'heeeello', 'a*b', 'axb', 'a\\b', 'a]b', 'a-b', 'a^b', 'abc', '[x', '\n',
+        'user:1', 'user:12', 'user:2', 'user:x:2', 'session:1', 'session:2']
+PATTERNS = ['h[^e]llo', 'h[ae]llo', 'h*llo', 'h?llo', 'a\\*b', 'a*b', 'a[\\]]b', 'a[a-c]c', 'a[c-a]c', '[[]x', 'a[^]b',
+            'a[]b', 'a\\\\b', 'a[-]b', 'a[^b]c', '[x', 'a[b', '?', '*', 'user:*', '*:[0-9]', 'user:1*', '*:[^0-9]:*']
+
+@pytest.fixture
+def conn(redis_port):
+    conn = redis.Redis(port=redis_port, db=2, decode_responses=True)
+    conn.flushdb()
+    for key in KEYS:
+        conn.set(key, '1')
+    yield conn
+    conn.close()
+
+@pytest.fixture
+def fetched_keys(monkeypatch):
+    fetched = []
+    process_key_batch = redis_extractor._process_key_batch
+
+    def recording_process_key_batch(keys, conn, *args, **kwargs):
+        fetched.extend(keys)
+        return process_key_batch(keys, conn, *args, **kwargs)
+
+    monkeypatch.setattr(redis_extractor, '_process_key_batch', recording_process_key_batch)
+    return fetched
+
+@pytest.mark.parametrize('pattern', PATTERNS)
+def test_compiled_pattern_matches_scan_match(conn, pattern):
+    regex = compile_key_pattern(pattern)
+
+    assert {key for key in KEYS if regex.fullmatch(key)} == set(conn.scan_iter(match=pattern))
+
+def test_excluded_keys_are_never_fetched(conn, fetched_keys):
+    kv_pairs = extract_database(conn, batch_size=3, patterns=['*', '!session:*', '!h[^e]llo'])
+
+    excluded = {'session:1', 'session:2', 'hallo', 'hxllo'}
+    assert not excluded & set(fetched_keys)
+    assert [key for key, _ in kv_pairs] == sorted(set(KEYS) - excluded)
+
+def test_overlapping_patterns_fetch_each_key_once(conn, fetched_keys):
+    key_values, stats = _collect_key_values(conn, 3, ['user:*', 'user:1*', 'h?llo'], ['user:x:*'], 2, None)
+
+    assert {pattern: s['keys'] for pattern, s in stats.items()} == {'user:*': 3, 'user:1*': 2, 'h?llo': 3}
+    assert sum(s['fetched'] for s in stats.values()) == len(key_values) == 6
+    assert sorted(fetched_keys) == sorted(key_values)
+
+def test_zero_max_workers_still_extracts(conn):
+    assert len(extract_database(conn, patterns=['user:*'], max_workers=0)) == 4
@@ -0,0 +1,39 @@
+from copy import deepcopy
+from key_parser import group_keys, build_nested_structure, split_key
+from schema_inference import batch_infer_values, extract_schema, _classify_strings, _infer_schema
+from schema_processor import group_schema_variations
+from utils import parse_value
+
+STRINGS = ['', '  ', '"5"', "'5'", '5', '-5', '05', '-0', '0.5', '00.5', '.5', '5.', '1.2.3', '1e5', '٣', '5\x00',
+           'True', 'false', 'null', 'NaN', "'a'", '{"a": 1}', '[1, 2]', 'hello', ' ' * 40 + '1', 'x' * 100]
+
+def _variations(kv_pairs, key_parts=None):
+    objects = [build_nested_structure(group_id, pairs) for group_id, pairs in group_keys(kv_pairs, key_parts).items()]
+    return group_schema_variations([extract_schema(obj) for obj in objects])
+
+def test_classified_strings_match_per_value_inference():
+    for value, inferred in zip(STRINGS, _classify_strings(STRINGS)):
+        if inferred is not None:
+            assert _infer_schema(inferred) == _infer_schema(value), value
+
+def test_batched_inference_yields_the_same_variations():
+    kv_pairs = []
+    for i, value in enumerate(STRINGS + [1, 2.5, True, None]):
+        kv_pairs += [
+            (f"product:{i}:price", value),
+            (f"product:{i}:tags[0]", value),
+            (f"user:{i}", {"age": str(i), "note": value}),
+            (f"list:{i}", [value, "7"]),
+        ]
+    kv_pairs.sort(key=lambda pair: pair[0])
+    key_parts = [split_key(key) for key, _ in kv_pairs]
+    ## The per-value path receives string keys already parsed by the extractor
+    parsed_pairs = [(key, parse_value(value) if isinstance(value, str) else value) for key, value in deepcopy(kv_pairs)]
+
+    assert _variations(batch_infer_values(kv_pairs, key_parts), key_parts) == _variations(parsed_pairs)
+
+def test_inferred_schemas_are_not_shared():
+    schema = _infer_schema(batch_infer_values([("user:1", "name")])[0][1])
+    schema["type"] = "changed"
+
+    assert _infer_schema(batch_infer_values([("user:2", "name")])[0][1]) == {"type": "string"}
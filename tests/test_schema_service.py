@@ -0,0 +1,140 @@
+import asyncio
+import json
+import pytest
+
+redis = pytest.importorskip('redis')
+import schema_service
+from schema_service import start_service
+
+@pytest.fixture
+def conn(redis_port):
+    conn = redis.Redis(port=redis_port, db=1, decode_responses=True)
+    conn.flushdb()
+    for i in range(5):
+        conn.set(f"user:{i}:name", f"user{i}")
+        conn.set(f"user:{i}:age", str(20 + i))
+        conn.hset(f"product:{i}", mapping={"price": "9.90", "name": "product"})
+    conn.set("session:1:token", "abc")
+    yield conn
+    conn.close()
+
+def _run(conn, key_patterns, scenario, failing_connections=0):
+    config = {'database': 1, 'batch_size': 100, 'max_workers': 2,
+              'key_patterns': key_patterns, 'batched_inference': False}
+    service_config = {'host': '127.0.0.1', 'port': 0, 'refresh_interval': 3600}
+    connections = []
+
+    def connection_factory():
+        if len(connections) < failing_connections:
+            connections.append(None)
+            raise redis.ConnectionError("Redis unavailable")
+        connections.append(redis.Redis(port=conn.connection_pool.connection_kwargs['port'], db=1, decode_responses=True))
+        return connections[-1]
+
+    async def main():
+        service, server, refresher = await start_service(config, service_config, connection_factory)
+        try:
+            return await scenario(server.sockets[0].getsockname()[1], service, connections)
+        finally:
+            refresher.cancel()
+            server.close()
+            await server.wait_closed()
+
+    return asyncio.run(main())
+
+async def _request(port, method, path, headers=None):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f"{method} {path} HTTP/1.1", "Host: localhost"]
+    lines += [f"{name}: {value}" for name, value in (headers or {}).items()]
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+
+    head, body = response.decode().split("\r\n\r\n", 1)
+    status_line, *header_lines = head.split("\r\n")
+    response_headers = dict(line.split(": ", 1) for line in header_lines)
+    return int(status_line.split()[1]), response_headers, json.loads(body) if body else None
+
+def test_schema_is_served_from_a_shared_extraction(conn):
+    async def scenario(port, service, connections):
+        responses = await asyncio.gather(*[_request(port, 'GET', '/schema') for _ in range(5)])
+        status, headers, body = responses[0]
+
+        assert status == 200
+        assert set(body['properties']) == {'user', 'product', 'session'}
+        assert body['properties']['user']['properties']['age'] == {'type': 'integer'}
+        assert len(connections) == 1
+
+        status, _, body = await _request(port, 'GET', '/schema', {'If-None-Match': headers['ETag']})
+        assert (status, body) == (304, None)
+
+    _run(conn, [], scenario)
+
+def test_entity_refresh_stays_within_configured_patterns(conn):
+    async def scenario(port, service, connections):
+        status, _, body = await _request(port, 'GET', '/schema')
+        assert set(body['properties']) == {'user'}
+
+        conn.set("user:9:email", "user9@example.com")
+        status, _, body = await _request(port, 'POST', '/schema/user/refresh')
+        assert status == 200
+        assert 'email' in body['schema']['properties']
+
+        status, _, _ = await _request(port, 'POST', '/schema/product/refresh')
+        assert status == 404
+        status, _, body = await _request(port, 'GET', '/schema')
+        assert set(body['properties']) == {'user'}
+
+    _run(conn, ['user:*'], scenario)
+
+def test_entity_named_refresh_can_be_read(conn):
+    conn.set("refresh:1:interval", "30")
+
+    async def scenario(port, service, connections):
+        status, _, body = await _request(port, 'GET', '/schema/refresh')
+        assert status == 200
+        assert body['schema']['properties']['interval'] == {'type': 'integer'}
+
+        status, _, _ = await _request(port, 'PUT', '/schema')
+        assert status == 405
+
+    _run(conn, [], scenario)
+
+
+def test_entity_refresh_does_not_count_as_first_load(conn):
+    async def scenario(port, service, connections):
+        while service._in_flight:
+            await asyncio.sleep(0.01)
+        assert service.updated_at is None
+
+        status, _, _ = await _request(port, 'POST', '/schema/user/refresh')
+        assert status == 200
+        assert service.updated_at is None
+
+        status, _, body = await _request(port, 'GET', '/schema')
+        assert status == 200
+        assert set(body['properties']) == {'user', 'product', 'session'}
+
+    _run(conn, [], scenario, failing_connections=1)
+
+def test_etags_are_computed_once_per_refresh(conn, monkeypatch):
+    hashes = []
+    get_schema_hash = schema_service.get_schema_hash
+    monkeypatch.setattr(schema_service, 'get_schema_hash', lambda schema: hashes.append(schema) or get_schema_hash(schema))
+
+    async def scenario(port, service, connections):
+        _, headers, _ = await _request(port, 'GET', '/schema/user')
+        computed = len(hashes)
+
+        for _ in range(3):
+            status, _, _ = await _request(port, 'GET', '/schema/user', {'If-None-Match': headers['ETag']})
+            assert status == 304
+        await _request(port, 'GET', '/schema')
+        assert len(hashes) == computed
+
+        conn.set("user:9:email", "user9@example.com")
+        _, refreshed, _ = await _request(port, 'POST', '/schema/user/refresh')
+        assert refreshed['ETag'] != headers['ETag']
+
+    _run(conn, [], scenario)
@@ -23,6 +23,52 @@ def parse_value(value):
     
     return value
 
+def compile_key_pattern(pattern):
+    """Compile a Redis glob pattern (as used by SCAN MATCH) into an equivalent regex."""
+    regex, i = [], 0
+    
+    while i < len(pattern):
+        char = pattern[i]
+        
+        if char == '*':
+            regex.append('.*')
+        elif char == '?':
+            regex.append('.')
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        elif char == '[':
+            i, char_class = _compile_char_class(pattern, i + 1)
+            regex.append(char_class)
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    
+    return re.compile(''.join(regex), re.DOTALL)
+
+def _compile_char_class(pattern, i):
+    ## Like Redis: '^' negates, '\\' escapes, 'a-z' is a range and an unclosed class ends with the pattern
+    negate = pattern[i:i + 1] == '^'
+    if negate:
+        i += 1
+    
+    items = []
+    while i < len(pattern) and pattern[i] != ']':
+        if pattern[i] == '\\' and i + 1 < len(pattern):
+            i += 1
+            items.append(re.escape(pattern[i]))
+        elif i + 2 < len(pattern) and pattern[i + 1] == '-':
+            start, end = sorted((pattern[i], pattern[i + 2]))
+            items.append(f"{re.escape(start)}-{re.escape(end)}")
+            i += 2
+        else:
+            items.append(re.escape(pattern[i]))
+        i += 1
+    
+    if not items:
+        return i, '.' if negate else '(?!)'
+    return i, f"[{'^' if negate else ''}{''.join(items)}]"
+
 def is_id_token(token):
     return token.isdigit() or UUID_REGEX.match(token)
 